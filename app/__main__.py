@@ -0,0 +1,22 @@
+"""Run the API server with ``python -m app``."""
+import uvicorn
+
+from app.core.config import settings
+
+
+def main() -> None:
+    """Start uvicorn using the server settings from the environment."""
+    uvicorn.run(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+        limit_concurrency=settings.limit_concurrency,
+        # "auto" picks uvloop/httptools when installed (not available on Windows)
+        loop="auto",
+        http="auto",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Shared FastAPI dependencies."""
+from fastapi import Request
+
+from app.services.proxy_checker import ProxyChecker
+
+
+def get_checker(request: Request) -> ProxyChecker:
+    """
+    Get the application-wide proxy checker.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        ProxyChecker bound to the shared client session
+    """
+    return request.app.state.checker
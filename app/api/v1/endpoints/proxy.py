@@ -1,53 +1,76 @@
 """Proxy checking endpoints."""
-from fastapi import APIRouter, HTTPException
+from typing import AsyncIterator
 
-from app.core.config import settings
+import orjson
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from app.api.deps import get_checker
 from app.core.schemas import (
     ProxyCheckRequest,
     ProxyCheckResponse,
     ProxyBatchCheckRequest,
     ProxyBatchCheckResponse,
 )
-from app.services.proxy_checker import ProxyChecker, ProxyStatus
+from app.services.proxy_checker import ProxyChecker, ProxyResult, ProxyStatus
 
 router = APIRouter()
 
 
+def _to_response(result: ProxyResult) -> ProxyCheckResponse:
+    """
+    Convert a service-level ProxyResult into its API response model.
+
+    The fields come from our own checker and are already well-typed, so the
+    model is constructed without running validation.
+    """
+    return ProxyCheckResponse.model_construct(
+        proxy=result.proxy,
+        status=result.status.value,
+        response_time=result.response_time,
+        ip_address=result.ip_address,
+        country=result.country,
+        city=result.city,
+        error=result.error,
+    )
+
+
 @router.post(
     "/check",
     response_model=ProxyCheckResponse,
     summary="Check a single proxy",
     description="Test a single proxy for connectivity and retrieve geographic information",
 )
-async def check_proxy(request: ProxyCheckRequest) -> ProxyCheckResponse:
+async def check_proxy(
+    request: ProxyCheckRequest,
+    checker: ProxyChecker = Depends(get_checker),
+) -> ORJSONResponse:
     """
     Check if a single proxy is working.
 
     Args:
-        request: ProxyCheckRequest containing proxy URL and timeout
+        request: ProxyCheckRequest containing proxy URL, timeout and check mode
+        checker: Shared ProxyChecker instance
 
     Returns:
-        ProxyCheckResponse with proxy test results
+        ProxyCheckResponse payload with proxy test results
 
     Raises:
         HTTPException: If the request is invalid
     """
     try:
-        checker = ProxyChecker(
+        result = await checker.check_proxy(
+            request.proxy,
             timeout=request.timeout,
-            test_url=settings.test_url,
-        )
-        result = await checker.check_proxy(request.proxy)
-
-        return ProxyCheckResponse(
-            proxy=result.proxy,
-            status=result.status.value,
-            response_time=result.response_time,
-            ip_address=result.ip_address,
-            country=result.country,
-            city=result.city,
-            error=result.error,
+            mode=request.mode,
         )
+
+        response = _to_response(result)
+
+        # Return the response directly so FastAPI skips re-validating it
+        # against response_model (which is kept for the OpenAPI schema);
+        # null fields are omitted to keep the payload small
+        return ORJSONResponse(content=response.model_dump(exclude_none=True))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error checking proxy: {str(e)}")
 
@@ -58,55 +81,109 @@ async def check_proxy(request: ProxyCheckRequest) -> ProxyCheckResponse:
     summary="Check multiple proxies",
     description="Test multiple proxies concurrently and get aggregated results",
 )
-async def check_batch(request: ProxyBatchCheckRequest) -> ProxyBatchCheckResponse:
+async def check_batch(
+    request: ProxyBatchCheckRequest,
+    checker: ProxyChecker = Depends(get_checker),
+) -> ORJSONResponse:
     """
     Check multiple proxies concurrently.
 
     Args:
         request: ProxyBatchCheckRequest containing list of proxies and settings
+        checker: Shared ProxyChecker instance
 
     Returns:
-        ProxyBatchCheckResponse with all results and statistics
+        ProxyBatchCheckResponse payload with all results and statistics
 
     Raises:
         HTTPException: If the request is invalid
     """
     try:
-        checker = ProxyChecker(
-            timeout=request.timeout,
-            test_url=settings.test_url,
-        )
         results = await checker.check_proxies(
             request.proxies,
             max_concurrent=request.max_concurrent,
+            timeout=request.timeout,
+            mode=request.mode,
         )
 
         # Convert results to response models
-        response_results = [
-            ProxyCheckResponse(
-                proxy=r.proxy,
-                status=r.status.value,
-                response_time=r.response_time,
-                ip_address=r.ip_address,
-                country=r.country,
-                city=r.city,
-                error=r.error,
-            )
-            for r in results
-        ]
+        response_results = [_to_response(r) for r in results]
 
         # Calculate statistics
         total = len(results)
-        working = sum(1 for r in results if r.status == ProxyStatus.WORKING)
+        working_status = ProxyStatus.WORKING
+        working = sum(1 for r in results if r.status is working_status)
         failed = total - working
         success_rate = round((working / total * 100), 2) if total > 0 else 0.0
 
-        return ProxyBatchCheckResponse(
+        response = ProxyBatchCheckResponse(
             results=response_results,
             total=total,
             working=working,
             failed=failed,
             success_rate=success_rate,
         )
+
+        # Return the response directly so FastAPI skips re-validating the
+        # whole result list against response_model; null fields are omitted
+        return ORJSONResponse(content=response.model_dump(exclude_none=True))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error checking proxies: {str(e)}")
+
+
+@router.post(
+    "/check-batch/stream",
+    summary="Stream results for multiple proxies",
+    description=(
+        "Test multiple proxies concurrently and stream each result as a "
+        "Server-Sent Event as soon as its check finishes"
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": (
+                "One `data:` event per input entry containing a ProxyCheckResponse "
+                "plus its `index` in the request's proxies list; "
+                "an `error` event is sent if checking fails part-way"
+            ),
+        }
+    },
+)
+async def check_batch_stream(
+    request: ProxyBatchCheckRequest,
+    checker: ProxyChecker = Depends(get_checker),
+) -> StreamingResponse:
+    """
+    Check multiple proxies concurrently and stream results as they complete.
+
+    Args:
+        request: ProxyBatchCheckRequest containing list of proxies and settings
+        checker: Shared ProxyChecker instance
+
+    Returns:
+        StreamingResponse emitting one ProxyCheckResponse (plus the entry's
+        index in request.proxies) per SSE event, or a
+        final "error" event if checking fails part-way
+    """
+
+    async def event_stream() -> AsyncIterator[bytes]:
+        try:
+            async for index, result in checker.iter_proxies(
+                request.proxies,
+                max_concurrent=request.max_concurrent,
+                timeout=request.timeout,
+                mode=request.mode,
+            ):
+                # Events arrive in completion order and carry the normalized
+                # proxy URL, so include the position in request.proxies
+                event = _to_response(result).model_dump(exclude_none=True)
+                event["index"] = index
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band to let
+            # clients tell an aborted stream apart from a completed one
+            payload = orjson.dumps({"detail": f"Error checking proxies: {str(e)}"})
+            yield b"event: error\ndata: " + payload + b"\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -1,4 +1,9 @@
 """Application configuration using pydantic-settings."""
+import os
+from functools import lru_cache
+from typing import Optional
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,11 +18,17 @@ class Settings(BaseSettings):
     # Server
     host: str = "0.0.0.0"
     port: int = 8000
+    workers: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    limit_concurrency: int = 1000
 
     # Proxy Testing
     default_timeout: int = 10
     default_max_concurrent: int = 10
     test_url: str = "http://ip-api.com/json/"
+    fast_test_url: str = "http://www.gstatic.com/generate_204"
+    geoip_database: Optional[str] = None
+    ip_echo_url: str = "http://api.ipify.org"
+    geo_cache_ttl: int = 600
 
     # CORS
     cors_origins: list[str] = ["*"]
@@ -32,4 +43,18 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Get the application settings, parsed from the environment only once.
+
+    Use as a FastAPI dependency so tests can swap it via dependency_overrides.
+
+    Returns:
+        Cached Settings instance
+    """
+    return Settings()
+
+
+# Backwards-compatible module-level alias
+settings = get_settings()
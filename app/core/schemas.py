@@ -1,5 +1,5 @@
 """Pydantic models for API request and response validation."""
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -17,6 +17,10 @@ class ProxyCheckRequest(BaseModel):
         le=60,
         description="Timeout in seconds (1-60)",
     )
+    mode: Literal["fast", "geo"] = Field(
+        default="geo",
+        description="fast: liveness-only HEAD probe; geo: also resolve IP, country and city",
+    )
 
 
 class ProxyBatchCheckRequest(BaseModel):
@@ -41,6 +45,10 @@ class ProxyBatchCheckRequest(BaseModel):
         le=50,
         description="Maximum concurrent checks (1-50)",
     )
+    mode: Literal["fast", "geo"] = Field(
+        default="geo",
+        description="fast: liveness-only HEAD probe; geo: also resolve IP, country and city",
+    )
 
 
 class ProxyCheckResponse(BaseModel):
@@ -1,14 +1,56 @@
 """FastAPI application entry point."""
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 from app.api.v1.router import api_router
-from app.core.config import settings
+from app.core.config import Settings, get_settings, settings
 from app.core.schemas import HealthResponse
+from app.services.geoip import open_geo_database
+from app.services.proxy_checker import ProxyChecker, create_session
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Manage resources shared across requests.
+
+    A single ProxyChecker backed by one long-lived client session is created at
+    startup so the connection pool and DNS cache stay warm between requests.
+    If a GeoLite2 database is configured it is opened once and shared too.
+    Settings are resolved through get_settings (honouring dependency_overrides)
+    so overridden configuration also reaches the checker.
+    """
+    app_settings = app.dependency_overrides.get(get_settings, get_settings)()
+
+    geo_reader = None
+    if app_settings.geoip_database:
+        geo_reader = open_geo_database(app_settings.geoip_database)
+
+    # No connector-wide limit: each request's worker pool already bounds its
+    # concurrency, and a shared cap would make requests queue for pool slots,
+    # inflating measured response times and causing false timeouts
+    session = create_session(max_connections=0)
+    app.state.checker = ProxyChecker(
+        timeout=app_settings.default_timeout,
+        test_url=app_settings.test_url,
+        session=session,
+        fast_url=app_settings.fast_test_url,
+        geo_reader=geo_reader,
+        ip_echo_url=app_settings.ip_echo_url,
+        cache_ttl=app_settings.geo_cache_ttl,
+    )
+    try:
+        yield
+    finally:
+        await session.close()
+        if geo_reader is not None:
+            geo_reader.close()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -18,6 +60,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 # Configure CORS middleware
@@ -45,17 +88,20 @@ if static_dir.exists():
     summary="Health check",
     description="Check if the API is running and healthy",
 )
-async def health_check() -> HealthResponse:
+async def health_check(app_settings: Settings = Depends(get_settings)) -> HealthResponse:
     """
     Health check endpoint.
 
+    Args:
+        app_settings: Application settings
+
     Returns:
         HealthResponse with API status and version information
     """
     return HealthResponse(
         status="healthy",
-        app_name=settings.app_name,
-        version=settings.app_version,
+        app_name=app_settings.app_name,
+        version=app_settings.app_version,
     )
 
 
@@ -63,10 +109,13 @@ async def health_check() -> HealthResponse:
     "/",
     include_in_schema=False,
 )
-async def root():
+async def root(app_settings: Settings = Depends(get_settings)):
     """
     Serve the frontend application.
 
+    Args:
+        app_settings: Application settings
+
     Returns:
         HTML page for the proxy checker UI
     """
@@ -76,8 +125,8 @@ async def root():
 
     # Fallback to API info if frontend not available
     return {
-        "message": f"Welcome to {settings.app_name}",
-        "version": settings.app_version,
+        "message": f"Welcome to {app_settings.app_name}",
+        "version": app_settings.app_version,
         "docs": "/docs",
         "health": "/api/v1/health",
     }
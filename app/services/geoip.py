@@ -0,0 +1,50 @@
+"""Local IP geolocation backed by a MaxMind GeoLite2 City database."""
+from typing import Any, Optional, Tuple
+
+
+def open_geo_database(path: str) -> Any:
+    """
+    Open a MaxMind database for memory-mapped lookups.
+
+    Args:
+        path: Path to a GeoLite2-City (or compatible) .mmdb file
+
+    Returns:
+        maxminddb Reader instance
+
+    Raises:
+        RuntimeError: If the optional maxminddb package is not installed
+    """
+    try:
+        import maxminddb
+    except ImportError as e:
+        raise RuntimeError(
+            "GEOIP_DATABASE is set but maxminddb is not installed; "
+            "install the 'geoip' extra"
+        ) from e
+
+    return maxminddb.open_database(path, maxminddb.MODE_MMAP)
+
+
+def lookup_location(reader: Any, ip_address: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Resolve the country and city of an IP address locally.
+
+    Args:
+        reader: Open maxminddb Reader
+        ip_address: IPv4 or IPv6 address
+
+    Returns:
+        Tuple of (country, city) English names, None where unknown
+    """
+    try:
+        record = reader.get(ip_address)
+    except ValueError:
+        return None, None
+
+    if not record:
+        return None, None
+
+    country = record.get("country", {}).get("names", {}).get("en")
+    city = record.get("city", {}).get("names", {}).get("en")
+    return country, city
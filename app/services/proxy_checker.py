@@ -1,11 +1,66 @@
 """Proxy checking service module."""
 import asyncio
+import ipaddress
+import socket
 import time
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from urllib.parse import urlsplit
 
 import aiohttp
+from cachetools import TTLCache
+
+from app.services.geoip import lookup_location
+
+# "fast" only probes liveness with a HEAD request; "geo" also resolves exit IP location
+CheckMode = Literal["fast", "geo"]
+
+# Proxy URL schemes accepted as-is; anything else is treated as HTTP.
+# A constant tuple lets str.startswith test every prefix in one C-level call.
+_SCHEMES = ("http://", "https://", "socks4://", "socks5://")
+
+
+def normalize_proxy(proxy: str) -> str:
+    """
+    Normalize a proxy string to a full proxy URL.
+
+    Args:
+        proxy: Proxy string in format 'protocol://host:port' or 'host:port'
+
+    Returns:
+        Proxy URL with an explicit scheme (defaults to http://)
+    """
+    return proxy if proxy.startswith(_SCHEMES) else f"http://{proxy}"
+
+
+_SCHEME_NAMES = frozenset(scheme[:-3] for scheme in _SCHEMES)
+_MALFORMED_ERROR = "Malformed proxy URL"
+
+
+def _is_valid_proxy(proxy: str) -> bool:
+    """
+    Check that a normalized proxy URL is well-formed enough to connect to.
+
+    Args:
+        proxy: Proxy URL including scheme
+
+    Returns:
+        True if the scheme is supported and host and port are present and valid
+    """
+    try:
+        parts = urlsplit(proxy)
+        port = parts.port
+    except ValueError:
+        return False
+    return (
+        parts.scheme in _SCHEME_NAMES
+        and bool(parts.hostname)
+        and port is not None
+        and 0 < port <= 65535
+    )
 
 
 class ProxyStatus(Enum):
@@ -16,7 +71,7 @@ class ProxyStatus(Enum):
     TIMEOUT = "timeout"
 
 
-@dataclass
+@dataclass(slots=True)
 class ProxyResult:
     """Result of a proxy check operation."""
 
@@ -29,65 +84,264 @@ class ProxyResult:
     error: Optional[str] = None
 
 
+def _is_socket_alive(sock) -> bool:
+    """
+    Check whether an idle pooled socket can still be reused.
+
+    Peeks at the socket without blocking: no pending data means the peer is
+    still connected, while EOF, an error or unsolicited data means it is stale.
+
+    Args:
+        sock: Socket (or asyncio TransportSocket) of a pooled connection
+
+    Returns:
+        True if the socket looks reusable
+    """
+    if sock is None or not hasattr(socket, "MSG_DONTWAIT"):
+        return True
+
+    try:
+        with sock.dup() as peek_sock:
+            peek_sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT)
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+class ValidatingTCPConnector(aiohttp.TCPConnector):
+    """
+    TCPConnector that drops dead pooled connections before reusing them.
+
+    Overrides the private TCPConnector._get(), whose return type has changed
+    between aiohttp releases; verified against aiohttp 3.14, which is why
+    pyproject.toml caps it at <3.15. Re-run the connector test in tests/
+    before raising that bound.
+    """
+
+    async def _get(self, *args, **kwargs):
+        while True:
+            conn = await super()._get(*args, **kwargs)
+            if conn is None or conn.transport is None:
+                return conn
+            if _is_socket_alive(conn.transport.get_extra_info("socket")):
+                return conn
+            # Closed by the proxy while idle: discard it and try the next one
+            conn.close()
+
+
+@lru_cache(maxsize=64)
+def _client_timeout(total: int) -> aiohttp.ClientTimeout:
+    """Return a shared (immutable) ClientTimeout for the given total seconds."""
+    return aiohttp.ClientTimeout(total=total)
+
+
+def create_session(max_connections: int = 100) -> aiohttp.ClientSession:
+    """
+    Create a client session with a pooled connector.
+
+    aiohttp is used because it accepts a different proxy on every request, so
+    one pooled session can serve a whole batch; clients that bind the proxy to
+    the client instance (e.g. httpx) would need a separate pool per proxy.
+
+    Args:
+        max_connections: Maximum number of simultaneous connections (0 for no limit)
+
+    Returns:
+        Configured aiohttp ClientSession
+    """
+    connector = ValidatingTCPConnector(
+        limit=max_connections,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True,
+        ssl=False,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
 class ProxyChecker:
     """Service for checking proxy connectivity and performance."""
 
-    def __init__(self, timeout: int = 10, test_url: str = "http://ip-api.com/json/"):
+    def __init__(
+        self,
+        timeout: int = 10,
+        test_url: str = "http://ip-api.com/json/",
+        session: Optional[aiohttp.ClientSession] = None,
+        fast_url: str = "http://www.gstatic.com/generate_204",
+        geo_reader: Optional[Any] = None,
+        ip_echo_url: str = "http://api.ipify.org",
+        cache_ttl: int = 600,
+    ):
         """
         Initialize proxy checker.
 
         Args:
-            timeout: Connection timeout in seconds
+            timeout: Default connection timeout in seconds
             test_url: URL to test proxies against (ip-api.com for geo location)
+            session: Optional long-lived session shared between checks; when
+                omitted a temporary session is created for each call
+            fast_url: Lightweight URL probed with HEAD in "fast" mode
+            geo_reader: Optional maxminddb Reader; when provided, "geo" mode
+                fetches ip_echo_url through the proxy and resolves location
+                locally instead of relying on test_url
+            ip_echo_url: URL returning the caller's IP as plain text
+            cache_ttl: Seconds to reuse the result of a working proxy
         """
         self.timeout = timeout
+        self._timeout = _client_timeout(timeout)
         self.test_url = test_url
+        self.session = session
+        self.fast_url = fast_url
+        self.geo_reader = geo_reader
+        self._geo_url = ip_echo_url if geo_reader is not None else test_url
+        # Recent successful checks keyed by normalized proxy URL:
+        # (ip_address, country, city, response_time)
+        self._result_cache: TTLCache = TTLCache(maxsize=10_000, ttl=cache_ttl)
 
-    async def check_proxy(self, proxy: str) -> ProxyResult:
+    @asynccontextmanager
+    async def _get_session(self, max_connections: int) -> AsyncIterator[aiohttp.ClientSession]:
+        """Yield the shared session, or a temporary one if none was provided."""
+        if self.session is not None:
+            yield self.session
+        else:
+            async with create_session(max_connections=max_connections) as session:
+                yield session
+
+    async def check_proxy(
+        self,
+        proxy: str,
+        timeout: Optional[int] = None,
+        mode: CheckMode = "geo",
+    ) -> ProxyResult:
         """
         Check if a single proxy is working.
 
         Args:
             proxy: Proxy string in format 'protocol://host:port' or 'host:port'
+            timeout: Connection timeout in seconds (defaults to self.timeout)
+            mode: "fast" for a liveness-only HEAD probe, "geo" to include location
 
         Returns:
             ProxyResult with validation details
         """
-        # Normalize proxy format
-        if not proxy.startswith(("http://", "https://", "socks4://", "socks5://")):
-            proxy = f"http://{proxy}"
+        proxy = normalize_proxy(proxy)
+        if not _is_valid_proxy(proxy):
+            return ProxyResult(proxy=proxy, status=ProxyStatus.FAILED, error=_MALFORMED_ERROR)
+
+        client_timeout = _client_timeout(timeout) if timeout else self._timeout
+
+        async with self._get_session(max_connections=1) as session:
+            return await self._check_normalized(proxy, session, client_timeout, mode)
+
+    async def _check_normalized(
+        self,
+        proxy: str,
+        session: aiohttp.ClientSession,
+        timeout: aiohttp.ClientTimeout,
+        mode: CheckMode,
+    ) -> ProxyResult:
+        """
+        Check a proxy whose URL has already been normalized.
+
+        Args:
+            proxy: Proxy URL including scheme
+            session: Session used to send the test request
+            timeout: Timeout applied to the test request
+            mode: "fast" for a liveness-only HEAD probe, "geo" to include location
+
+        Returns:
+            ProxyResult with validation details
+        """
+        cached = self._result_cache.get(proxy)
+        # A cached result only stands in for a check that would have
+        # succeeded within this request's timeout
+        if cached is not None and cached[3] <= timeout.total:
+            ip_address, country, city, response_time = cached
+            if mode == "fast":
+                return ProxyResult(
+                    proxy=proxy,
+                    status=ProxyStatus.WORKING,
+                    response_time=response_time,
+                )
+            return ProxyResult(
+                proxy=proxy,
+                status=ProxyStatus.WORKING,
+                response_time=response_time,
+                ip_address=ip_address,
+                country=country,
+                city=city,
+            )
 
         start_time = time.time()
 
         try:
-            proxy_url = proxy
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.test_url,
-                    proxy=proxy_url,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout),
-                    ssl=False,
-                ) as response:
-                    response_time = time.time() - start_time
-
-                    if response.status == 200:
-                        data = await response.json()
+            if mode == "fast":
+                request = session.head(
+                    self.fast_url,
+                    proxy=proxy,
+                    timeout=timeout,
+                )
+            else:
+                request = session.get(
+                    self._geo_url,
+                    proxy=proxy,
+                    timeout=timeout,
+                )
 
-                        return ProxyResult(
-                            proxy=proxy,
-                            status=ProxyStatus.WORKING,
-                            response_time=round(response_time, 2),
-                            ip_address=data.get("query"),
-                            country=data.get("country"),
-                            city=data.get("city"),
-                        )
+            async with request as response:
+                response_time = time.time() - start_time
+
+                if mode == "fast" and 200 <= response.status < 300:
+                    # Liveness only: no body to read or parse. HEAD does not
+                    # follow redirects, so a 3xx (captive portal, auth wall)
+                    # falls through to FAILED
+                    return ProxyResult(
+                        proxy=proxy,
+                        status=ProxyStatus.WORKING,
+                        response_time=round(response_time, 2),
+                    )
+                elif mode == "geo" and response.status == 200:
+                    if self.geo_reader is not None:
+                        ip_address = (await response.text()).strip()
+                        try:
+                            ipaddress.ip_address(ip_address)
+                        except ValueError:
+                            # e.g. an HTML page injected by the proxy
+                            return ProxyResult(
+                                proxy=proxy,
+                                status=ProxyStatus.FAILED,
+                                error="Invalid IP echo response",
+                            )
+                        country, city = lookup_location(self.geo_reader, ip_address)
                     else:
-                        return ProxyResult(
-                            proxy=proxy,
-                            status=ProxyStatus.FAILED,
-                            error=f"HTTP {response.status}",
-                        )
+                        data = await response.json()
+                        ip_address = data.get("query")
+                        country = data.get("country")
+                        city = data.get("city")
+
+                    result = ProxyResult(
+                        proxy=proxy,
+                        status=ProxyStatus.WORKING,
+                        response_time=round(response_time, 2),
+                        ip_address=ip_address,
+                        country=country,
+                        city=city,
+                    )
+                    self._result_cache[proxy] = (
+                        result.ip_address,
+                        result.country,
+                        result.city,
+                        result.response_time,
+                    )
+
+                    return result
+                else:
+                    return ProxyResult(
+                        proxy=proxy,
+                        status=ProxyStatus.FAILED,
+                        error=f"HTTP {response.status}",
+                    )
 
         except asyncio.TimeoutError:
             return ProxyResult(
@@ -103,7 +357,11 @@ class ProxyChecker:
             )
 
     async def check_proxies(
-        self, proxies: List[str], max_concurrent: int = 10
+        self,
+        proxies: List[str],
+        max_concurrent: int = 10,
+        timeout: Optional[int] = None,
+        mode: CheckMode = "geo",
     ) -> List[ProxyResult]:
         """
         Check multiple proxies concurrently.
@@ -111,17 +369,101 @@ class ProxyChecker:
         Args:
             proxies: List of proxy strings
             max_concurrent: Maximum number of concurrent checks
+            timeout: Connection timeout in seconds (defaults to self.timeout)
+            mode: "fast" for a liveness-only HEAD probe, "geo" to include location
 
         Returns:
-            List of ProxyResult objects
+            List of ProxyResult objects in the same order as proxies
         """
-        semaphore = asyncio.Semaphore(max_concurrent)
+        results: List[Optional[ProxyResult]] = [None] * len(proxies)
 
-        async def check_with_semaphore(proxy: str) -> ProxyResult:
-            async with semaphore:
-                return await self.check_proxy(proxy)
-
-        tasks = [check_with_semaphore(proxy) for proxy in proxies]
-        results = await asyncio.gather(*tasks)
+        async for index, result in self.iter_proxies(
+            proxies,
+            max_concurrent=max_concurrent,
+            timeout=timeout,
+            mode=mode,
+        ):
+            results[index] = result
 
         return results
+
+    async def iter_proxies(
+        self,
+        proxies: List[str],
+        max_concurrent: int = 10,
+        timeout: Optional[int] = None,
+        mode: CheckMode = "geo",
+    ) -> AsyncIterator[Tuple[int, ProxyResult]]:
+        """
+        Check multiple proxies concurrently, yielding results as they complete.
+
+        Args:
+            proxies: List of proxy strings
+            max_concurrent: Maximum number of concurrent checks
+            timeout: Connection timeout in seconds (defaults to self.timeout)
+            mode: "fast" for a liveness-only HEAD probe, "geo" to include location
+
+        Yields:
+            Tuples of (index in proxies, ProxyResult) in completion order
+        """
+        # Check each distinct proxy once; duplicates share its result
+        unique: Dict[str, List[int]] = {}
+        for index, proxy in enumerate(proxies):
+            unique.setdefault(normalize_proxy(proxy), []).append(index)
+
+        # Malformed entries fail immediately without any network I/O
+        pending: asyncio.Queue = asyncio.Queue()
+        for proxy, indices in unique.items():
+            if _is_valid_proxy(proxy):
+                pending.put_nowait(proxy)
+            else:
+                result = ProxyResult(
+                    proxy=proxy, status=ProxyStatus.FAILED, error=_MALFORMED_ERROR
+                )
+                for index in indices:
+                    yield index, result
+
+        checks = pending.qsize()
+        if not checks:
+            return
+
+        completed: asyncio.Queue = asyncio.Queue()
+        client_timeout = _client_timeout(timeout) if timeout else self._timeout
+
+        async with self._get_session(max_connections=max_concurrent) as session:
+
+            async def worker() -> None:
+                while True:
+                    try:
+                        proxy = pending.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        result = await self._check_normalized(
+                            proxy, session, client_timeout, mode
+                        )
+                    except Exception as e:
+                        # Defensive: _check_normalized already turns every
+                        # Exception into a FAILED result, so this only fires
+                        # if the check itself is replaced (as in the tests).
+                        # It keeps the consumer from waiting forever then.
+                        completed.put_nowait((proxy, e))
+                        return
+                    completed.put_nowait((proxy, result))
+
+            workers = [
+                asyncio.create_task(worker())
+                for _ in range(min(max_concurrent, checks))
+            ]
+            try:
+                for _ in range(checks):
+                    proxy, result = await completed.get()
+                    if isinstance(result, Exception):
+                        raise result
+                    for index in unique[proxy]:
+                        yield index, result
+            finally:
+                # Stop outstanding checks if the consumer goes away early
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
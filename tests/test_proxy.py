@@ -1,13 +1,60 @@
 """Test cases for proxy checking endpoints."""
+import asyncio
+import json
+import socket
+import threading
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.config import Settings, get_settings
 from app.main import app
+from app.services import proxy_checker
+from app.services.geoip import lookup_location
+from app.services.proxy_checker import (
+    ProxyChecker,
+    ProxyResult,
+    ProxyStatus,
+    _is_socket_alive,
+)
+
+
+class FakeProxy:
+    """Local HTTP proxy stub that answers every request with a canned response."""
+
+    def __init__(self):
+        self.response = b"HTTP/1.1 204 No Content\r\nConnection: close\r\n\r\n"
+        self.requests = []
+        self.address = None
+
+    async def handle(self, reader, writer):
+        request = await reader.readuntil(b"\r\n\r\n")
+        self.requests.append(request.split(b"\r\n", 1)[0].decode())
+        writer.write(self.response)
+        await writer.drain()
+        writer.close()
+
 
-client = TestClient(app)
+@pytest.fixture
+async def fake_proxy():
+    """Run a FakeProxy on a free local port."""
+    proxy = FakeProxy()
+    server = await asyncio.start_server(proxy.handle, "127.0.0.1", 0)
+    proxy.address = "127.0.0.1:%d" % server.sockets[0].getsockname()[1]
+    yield proxy
+    server.close()
+    await server.wait_closed()
 
 
-def test_health_check():
+@pytest.fixture(scope="module")
+def client():
+    """Test client that runs the application lifespan."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_health_check(client):
     """Test the health check endpoint."""
     response = client.get("/api/v1/health")
     assert response.status_code == 200
@@ -17,7 +64,34 @@ def test_health_check():
     assert data["version"] == "1.0.0"
 
 
-def test_root_endpoint():
+def test_health_check_uses_settings_dependency(client):
+    """Test that settings can be overridden through the FastAPI dependency."""
+    app.dependency_overrides[get_settings] = lambda: Settings(app_name="Override API")
+    try:
+        response = client.get("/api/v1/health")
+    finally:
+        app.dependency_overrides.pop(get_settings, None)
+    assert response.status_code == 200
+    assert response.json()["app_name"] == "Override API"
+
+
+def test_settings_override_reaches_checker(client):
+    """Test that a get_settings override is applied to the lifespan's checker."""
+    # The nested lifespan replaces app.state.checker and closes its session on
+    # exit, so restore the shared fixture's checker for later tests
+    shared_checker = app.state.checker
+    app.dependency_overrides[get_settings] = lambda: Settings(default_timeout=3)
+    try:
+        with TestClient(app):
+            assert app.state.checker.timeout == 3
+    finally:
+        app.dependency_overrides.pop(get_settings, None)
+        app.state.checker = shared_checker
+
+    assert not app.state.checker.session.closed
+
+
+def test_root_endpoint(client):
     """Test the root endpoint."""
     response = client.get("/")
     assert response.status_code == 200
@@ -27,25 +101,45 @@ def test_root_endpoint():
     assert "docs" in data
 
 
-def test_check_proxy_invalid_request():
+def test_shared_session_has_no_connection_limit(client):
+    """Test that concurrent requests never queue for slots in the shared pool."""
+    assert app.state.checker.session.connector.limit == 0
+
+
+def test_check_proxy_invalid_request(client):
     """Test proxy check with invalid request."""
     response = client.post("/api/v1/proxy/check", json={})
     assert response.status_code == 422  # Validation error
 
 
-def test_check_batch_invalid_request():
+def test_check_batch_invalid_request(client):
     """Test batch proxy check with invalid request."""
     response = client.post("/api/v1/proxy/check-batch", json={})
     assert response.status_code == 422  # Validation error
 
 
-def test_check_batch_empty_list():
+def test_check_proxy_invalid_mode(client):
+    """Test proxy check with an unknown check mode."""
+    response = client.post(
+        "/api/v1/proxy/check",
+        json={"proxy": "http://proxy.example.com:8080", "mode": "slow"},
+    )
+    assert response.status_code == 422  # Validation error
+
+
+def test_check_batch_stream_invalid_request(client):
+    """Test streaming batch proxy check with invalid request."""
+    response = client.post("/api/v1/proxy/check-batch/stream", json={})
+    assert response.status_code == 422  # Validation error
+
+
+def test_check_batch_empty_list(client):
     """Test batch proxy check with empty list."""
     response = client.post("/api/v1/proxy/check-batch", json={"proxies": []})
     assert response.status_code == 422  # Validation error (min 1 item)
 
 
-def test_openapi_schema():
+def test_openapi_schema(client):
     """Test that OpenAPI schema is accessible."""
     response = client.get("/openapi.json")
     assert response.status_code == 200
@@ -53,3 +147,293 @@ def test_openapi_schema():
     assert "openapi" in data
     assert "info" in data
     assert data["info"]["title"] == "Proxy Checker API"
+
+
+async def test_check_proxy_uses_cached_result():
+    """Test that a recently working proxy is served from the result cache."""
+    checker = ProxyChecker(session=object())
+    checker._result_cache["http://cached.example.com:8080"] = (
+        "1.2.3.4",
+        "Testland",
+        "Test City",
+        0.5,
+    )
+
+    # The session must not be touched on a cache hit
+    result = await checker.check_proxy("cached.example.com:8080")
+
+    assert result.status == ProxyStatus.WORKING
+    assert result.ip_address == "1.2.3.4"
+    assert result.country == "Testland"
+    assert result.response_time == 0.5
+
+    fast = await checker.check_proxy("cached.example.com:8080", mode="fast")
+    assert fast.status == ProxyStatus.WORKING
+    assert fast.response_time == 0.5
+    assert fast.ip_address is None
+    assert fast.country is None
+
+
+async def test_check_proxy_ignores_cache_slower_than_timeout():
+    """Test that a cached result slower than the requested timeout is not reused."""
+    checker = ProxyChecker(session=object())
+    checker._result_cache["http://slow.example.com:8080"] = ("1.2.3.4", None, None, 9.5)
+
+    # Falls through to a real check, which fails on the dummy session
+    result = await checker.check_proxy("slow.example.com:8080", timeout=1)
+
+    assert result.status != ProxyStatus.WORKING
+    assert result.response_time is None
+
+
+def test_is_socket_alive_detects_closed_peer():
+    """Test that idle sockets are kept and sockets closed by the peer are dropped."""
+    local, remote = socket.socketpair()
+    local.setblocking(False)
+    try:
+        assert _is_socket_alive(local)
+        remote.close()
+        assert not _is_socket_alive(local)
+    finally:
+        local.close()
+
+
+async def test_validating_connector_discards_dead_pooled_connection(monkeypatch):
+    """Test that a pooled connection closed by the server is not reused."""
+    checks = []
+    original = proxy_checker._is_socket_alive
+
+    def spy(sock):
+        checks.append(original(sock))
+        return checks[-1]
+
+    monkeypatch.setattr(proxy_checker, "_is_socket_alive", spy)
+
+    listener = socket.create_server(("127.0.0.1", 0))
+    accepted = []
+
+    def serve():
+        for _ in range(2):
+            conn, _ = listener.accept()
+            accepted.append(conn)
+            conn.recv(65536)
+            conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    url = "http://127.0.0.1:%d/" % listener.getsockname()[1]
+
+    try:
+        async with proxy_checker.create_session() as session:
+            async with session.get(url) as response:
+                assert await response.text() == "ok"
+
+            # Close the idle keep-alive connection server-side, then wait
+            # without yielding to the event loop so aiohttp has not yet
+            # noticed and still hands the dead connection out of its pool
+            accepted[0].close()
+            time.sleep(0.1)
+
+            async with session.get(url) as response:
+                assert await response.text() == "ok"
+    finally:
+        thread.join(timeout=5)
+        for conn in accepted:
+            conn.close()
+        listener.close()
+
+    assert checks == [False]
+    assert len(accepted) == 2
+
+
+def make_stub_checker(check=None):
+    """
+    Build a ProxyChecker whose per-proxy network check is replaced by a stub.
+
+    Args:
+        check: Optional callable taking the normalized proxy and returning a
+            ProxyResult (or raising); defaults to a FAILED "test" result
+
+    Returns:
+        Tuple of (checker, list of normalized proxies that were checked)
+    """
+    checker = ProxyChecker(session=object())
+    checked = []
+
+    async def fake_check(proxy, session, timeout, mode):
+        checked.append(proxy)
+        if check is not None:
+            return check(proxy)
+        return ProxyResult(proxy=proxy, status=ProxyStatus.FAILED, error="test")
+
+    checker._check_normalized = fake_check
+    return checker, checked
+
+
+async def test_check_proxies_deduplicates():
+    """Test that duplicate proxies in a batch are only checked once."""
+    checker, checked = make_stub_checker()
+    results = await checker.check_proxies(
+        ["a.example.com:1", "http://a.example.com:1", "b.example.com:2", "a.example.com:1"]
+    )
+
+    assert sorted(checked) == ["http://a.example.com:1", "http://b.example.com:2"]
+    assert [r.proxy for r in results] == [
+        "http://a.example.com:1",
+        "http://a.example.com:1",
+        "http://b.example.com:2",
+        "http://a.example.com:1",
+    ]
+
+
+async def test_check_proxies_rejects_malformed_without_network():
+    """Test that malformed proxies fail immediately without being checked."""
+    checker, checked = make_stub_checker()
+    results = await checker.check_proxies(
+        ["proxy.example.com", "proxy.example.com:99999", ":8080", "ok.example.com:8080"]
+    )
+
+    assert checked == ["http://ok.example.com:8080"]
+    assert [r.error for r in results] == [
+        "Malformed proxy URL",
+        "Malformed proxy URL",
+        "Malformed proxy URL",
+        "test",
+    ]
+
+
+async def test_check_proxies_propagates_unexpected_errors():
+    """Test that an unexpected error in a check is raised instead of hanging."""
+
+    def fail(proxy):
+        raise RuntimeError("boom")
+
+    checker, _ = make_stub_checker(fail)
+    with pytest.raises(RuntimeError, match="boom"):
+        await asyncio.wait_for(
+            checker.check_proxies(["a.example.com:1", "b.example.com:2"]), timeout=5
+        )
+
+
+class FakeGeoReader:
+    """In-memory stand-in for a maxminddb Reader."""
+
+    def get(self, ip_address):
+        if ip_address == "not-an-ip":
+            raise ValueError(ip_address)
+        if ip_address == "8.8.8.8":
+            return {
+                "country": {"names": {"en": "United States", "de": "USA"}},
+                "city": {"names": {"en": "Mountain View"}},
+            }
+        return None
+
+
+def test_lookup_location_reads_english_names():
+    """Test local geolocation lookups against a GeoLite2-shaped record."""
+    reader = FakeGeoReader()
+    assert lookup_location(reader, "8.8.8.8") == ("United States", "Mountain View")
+    assert lookup_location(reader, "10.0.0.1") == (None, None)
+    assert lookup_location(reader, "not-an-ip") == (None, None)
+
+
+async def test_check_proxy_fast_mode_sends_head(fake_proxy):
+    """Test that fast mode probes fast_url with HEAD and returns no geo fields."""
+    checker = ProxyChecker(fast_url="http://probe.example.com/generate_204")
+
+    result = await checker.check_proxy(fake_proxy.address, mode="fast")
+
+    assert fake_proxy.requests == ["HEAD http://probe.example.com/generate_204 HTTP/1.1"]
+    assert result.status == ProxyStatus.WORKING
+    assert result.response_time is not None
+    assert result.ip_address is None
+    assert result.country is None
+    assert result.city is None
+
+
+async def test_check_proxy_fast_mode_rejects_redirect(fake_proxy):
+    """Test that a redirect (e.g. a captive portal) does not count as working."""
+    fake_proxy.response = (
+        b"HTTP/1.1 302 Found\r\nLocation: http://portal.example.com/\r\n"
+        b"Content-Length: 0\r\nConnection: close\r\n\r\n"
+    )
+
+    result = await ProxyChecker().check_proxy(fake_proxy.address, mode="fast")
+
+    assert result.status == ProxyStatus.FAILED
+    assert result.error == "HTTP 302"
+
+
+def _text_response(body):
+    """Build a plain-text HTTP 200 response for FakeProxy."""
+    return (
+        b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n"
+        b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body)
+    )
+
+
+async def test_check_proxy_resolves_geo_locally(fake_proxy):
+    """Test that with a geo reader the IP echo is fetched and resolved locally."""
+    fake_proxy.response = _text_response(b"8.8.8.8\n")
+    checker = ProxyChecker(geo_reader=FakeGeoReader(), ip_echo_url="http://echo.example.com/")
+
+    result = await checker.check_proxy(fake_proxy.address)
+
+    assert fake_proxy.requests == ["GET http://echo.example.com/ HTTP/1.1"]
+    assert result.status == ProxyStatus.WORKING
+    assert result.ip_address == "8.8.8.8"
+    assert result.country == "United States"
+    assert result.city == "Mountain View"
+
+
+async def test_check_proxy_rejects_non_ip_echo(fake_proxy):
+    """Test that a non-IP echo body (e.g. an injected HTML page) fails the check."""
+    fake_proxy.response = _text_response(b"<html>Please log in</html>")
+    checker = ProxyChecker(geo_reader=FakeGeoReader(), ip_echo_url="http://echo.example.com/")
+
+    result = await checker.check_proxy(fake_proxy.address)
+
+    assert result.status == ProxyStatus.FAILED
+    assert result.error == "Invalid IP echo response"
+    assert result.ip_address is None
+    assert not checker._result_cache
+
+
+def test_check_batch_stream_sends_one_event_per_entry(client):
+    """Test SSE framing using malformed proxies, which need no network access."""
+    proxies = ["bad-one", "bad-two", "bad-one", "http://bad-one"]
+    response = client.post("/api/v1/proxy/check-batch/stream", json={"proxies": proxies})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.endswith("\n\n")
+    events = response.text.split("\n\n")[:-1]
+    assert len(events) == len(proxies)
+    indices = []
+    for event in events:
+        assert event.startswith("data: ")
+        data = json.loads(event[len("data: "):])
+        assert data["status"] == "failed"
+        assert data["error"] == "Malformed proxy URL"
+        indices.append(data["index"])
+    assert sorted(indices) == list(range(len(proxies)))
+
+
+def test_check_batch_stream_reports_error_event(client, monkeypatch):
+    """Test that a failure mid-stream ends with an SSE error event."""
+
+    class FailingChecker:
+        async def iter_proxies(self, proxies, **kwargs):
+            yield 0, ProxyResult(proxy="http://a.example.com:1", status=ProxyStatus.FAILED)
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(app.state, "checker", FailingChecker())
+    response = client.post(
+        "/api/v1/proxy/check-batch/stream",
+        json={"proxies": ["a.example.com:1", "b.example.com:2"]},
+    )
+
+    events = response.text.split("\n\n")[:-1]
+    assert events[0].startswith("data: ")
+    assert events[-1].startswith("event: error\ndata: ")
+    assert "boom" in events[-1]